@@ -1,29 +1,66 @@
 import asyncio
+import contextvars
+import logging
+import os
+import queue
 import random
-from contextlib import asynccontextmanager
-from enum import Enum
-from typing import List
-import aiofiles
+from contextlib import asynccontextmanager, contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Literal, Optional
 from pathlib import Path
-from utils.utils import produce_random_wind_speed, produce_random_power_output_in_kwh, \
-    produce_random_time_to_fail_in_seconds, produce_random_time_to_repair_in_seconds
+from utils.utils import produce_random_wind_speed, produce_random_power_output_in_kwh, produce_random_batches
 
 import httpx
+import orjson
 import typer
 import uvicorn
+import uvloop
 from fastapi import FastAPI
 import time
 
-# Assume pydantic version 1.*
+# Pydantic is only used to validate request bodies at the grid monitor app boundary
 from pydantic import BaseModel
 
 app = typer.Typer() 
 
+logger = logging.getLogger("wind_turbines_grid_monitoring")
+logger.setLevel(logging.INFO)
 
-class OperationalStatus(str, Enum):
-    """Class attributes with fixed, string values: ok and broken."""
-    ok = "ok"
-    broken = "broken"
+
+@contextmanager
+def queued_logging():
+    """Route the log records through a queue while the wind turbines or the grid monitor app are running.
+
+    Note: Log records are only enqueued on the event loop thread; a listener thread writes them to stderr.
+        Outside of this context, log records propagate to the root logger as usual.
+    """
+    log_queue = queue.Queue(-1)
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    log_listener = QueueListener(log_queue, log_handler)
+    queue_handler = QueueHandler(log_queue)
+    log_listener.start()
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+    try:
+        yield
+    finally:
+        logger.removeHandler(queue_handler)
+        logger.propagate = True
+        log_listener.stop()  # Writes the remaining log records before returning
+
+METRICS_LOG_FILE_NAME = "turbine_metrics.txt"  # Append-only log shared by all turbines
+DROPPED_METRICS_WARNING_INTERVAL = 1000  # Warn on the first dropped metrics, then once every this many drops
+
+# The long-running tasks do not use context variables, so they share one empty context instead of a copy each.
+_EMPTY_CONTEXT = contextvars.Context()
+
+
+# Operational statuses of a turbine; plain strings keep status comparisons on the hot path cheap.
+OK = "ok"
+BROKEN = "broken"
+OPERATIONAL_STATUSES = (OK, BROKEN)
+OperationalStatus = Literal["ok", "broken"]
 
 
 class TurbineMetrics(BaseModel):
@@ -39,7 +76,106 @@ class TurbineMetrics(BaseModel):
     timestamp: float
 
 
-repairs_queue = asyncio.Queue()  # Create a queue of work; non-blocking async queue.
+class MetricsBatcher:
+    def __init__(
+        self,
+        grid_monitor_url: str = "http://grid-monitor-app:8787",
+        batch_size: int = 50,
+        flush_interval_in_seconds: float = 1.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        # Make sure we store the url for the grid monitor to which we will be pushing our metrics
+        self.grid_monitor_url = grid_monitor_url
+
+        # This defines the maximum number of metrics sent in a single request
+        self.batch_size = batch_size
+
+        # This defines how long the first queued metrics may wait before the batch is sent
+        self.flush_interval_in_seconds = flush_interval_in_seconds
+
+        # Metrics submitted by the wind turbines, waiting to be sent to the grid monitor app
+        self.metrics_queue = asyncio.Queue()
+
+        # HTTP client shared by every batch upload while the batcher is running; created in run()
+        self._client: httpx.AsyncClient | None = None
+
+        # Optional transport for the HTTP client (e.g. httpx.MockTransport); the default network transport otherwise
+        self._transport = transport
+
+    async def submit(self, turbine_metrics: bytes) -> None:
+        """Queue turbine metrics to be sent with the next batch.
+
+        Args:
+            turbine_metrics (bytes): JSON serialized metrics to be pushed to the grid monitor app.
+        """
+        await self.metrics_queue.put(turbine_metrics)
+
+    async def post_batch(self, turbine_metrics_batch: List[bytes]) -> None:
+        """Push a batch of turbine metrics to the grid monitor app in a single request.
+
+        Args:
+            turbine_metrics_batch (List[bytes]): JSON serialized metrics to be pushed to the grid monitor app.
+        """
+        # The metrics are already serialized, so the request body is assembled as a JSON array of bytes.
+        r = await self._client.post(
+            f"{self.grid_monitor_url}/post_metrics_batch",
+            content=b"[" + b",".join(turbine_metrics_batch) + b"]",
+            headers={"content-type": "application/json"},
+            timeout=30,
+        )
+        r.raise_for_status()  # Raise HTTPStatusError if one occurred.
+
+    async def flush(self, turbine_metrics_batch: List[bytes]) -> None:
+        """Push a batch of turbine metrics to the grid monitor app, dropping it if the request fails.
+
+        Note: The batcher is shared by all turbines, so a failed request is logged rather than raised;
+            otherwise a single transient error would stop every turbine.
+        Args:
+            turbine_metrics_batch (List[bytes]): JSON serialized metrics to be pushed to the grid monitor app.
+        """
+        try:
+            await self.post_batch(turbine_metrics_batch)
+        except Exception:
+            logger.exception("Could not push a batch of %d metrics to the grid monitor app.", len(turbine_metrics_batch))
+
+    async def run(self) -> None:
+        """Run the metrics batcher.
+
+        Note: A batch is sent once batch_size metrics have been queued, or once flush_interval_in_seconds
+            has elapsed since the first metrics of the batch were queued, whichever comes first.
+            On shutdown, the metrics that have not been sent yet are flushed on a best-effort basis.
+        """
+        loop = asyncio.get_running_loop()
+        # Use 30s as default timeout instead of the default 5s when sending requests.
+        self._client = httpx.AsyncClient(
+            timeout=30,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            transport=self._transport,
+        )
+        batch = []
+        try:
+            flush_deadline = None
+            while True:
+                timeout = None if flush_deadline is None else max(flush_deadline - loop.time(), 0.0)
+                try:
+                    batch.append(await asyncio.wait_for(self.metrics_queue.get(), timeout=timeout))
+                    if flush_deadline is None:
+                        flush_deadline = loop.time() + self.flush_interval_in_seconds
+                except asyncio.TimeoutError:
+                    pass
+
+                if len(batch) >= self.batch_size or (flush_deadline is not None and loop.time() >= flush_deadline):
+                    await self.flush(batch)
+                    batch = []
+                    flush_deadline = None
+        finally:
+            while not self.metrics_queue.empty():
+                batch.append(self.metrics_queue.get_nowait())
+            if batch:
+                await self.flush(batch)
+            await self._client.aclose()
+            self._client = None
+
 
 class WindTurbine:
     def __init__(
@@ -51,6 +187,7 @@ class WindTurbine:
         time_to_fail_in_seconds: float = max(random.random() * 30.0, 1.0),
         time_to_repair_in_seconds: float = max(random.random() * 5.0, 1.0),
         grid_monitor_url: str = "http://grid-monitor-app:8787",
+        batcher: MetricsBatcher | None = None,
     ) -> None:
         # This is the unique identifier of the turbine
         self.turbine_number = turbine_number
@@ -71,68 +208,69 @@ class WindTurbine:
         self.time_to_repair_in_seconds = time_to_repair_in_seconds
         
         # Here we define our current operational status of the turbine
-        self.operational_status = OperationalStatus.ok
+        self.operational_status = OK
         
-        # Here we can keep time since the turbine has started or the turbine has been repaired
-        self.time_passed_in_seconds = 0.0
+        # Here we keep the event loop time at which the turbine has started or has been repaired
+        self.started_at_in_seconds: float | None = None
         
         # Make sure we store the url for the grid monitor to which we will be pushing our metrics
         self.grid_monitor_url = grid_monitor_url
 
-    async def produce_metrics(self, turbine_metrics: TurbineMetrics) -> None:
-        """Produce wind turbine metrics.
+        # Metrics are pushed to the grid monitor app in batches; a shared batcher is run by its owner,
+        # otherwise the turbine creates and runs its own batcher in run()
+        self.batcher: MetricsBatcher | None = batcher
+        self._owns_batcher = batcher is None
 
-        Args:
-            turbine_metrics (TurbineMetrics): Metrics to be pushed to the grid monitor app.
+        # Pre-serialized metrics for each operational status of the turbine
+        self._metrics_templates: Dict[OperationalStatus, bytes] = {}
+        self.build_metrics_templates()
+
+    def build_metrics_templates(self) -> None:
+        """Pre-serialize the metrics of the turbine for each operational status.
+
+        Note: Only the timestamp changes between metrics with the same operational status, so each template
+            holds the JSON object up to the timestamp value. Call it again if wind_speed or power_output_in_kwh change.
         """
-        # Use 30s as default timeout instead of the default 5s when sending requests.
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.post(
-                f"{self.grid_monitor_url}/post_metrics",
-                json=turbine_metrics.model_dump(),
-                timeout=30,
-            )
-            r.raise_for_status()  # Raise HTTPStatusError if one occurred.
+        self._metrics_templates = {
+            operational_status: orjson.dumps(
+                {
+                    "turbine_number": self.turbine_number,
+                    "wind_speed": self.wind_speed,
+                    "power_output_in_kwh": self.power_output_in_kwh,
+                    "operational_status": operational_status,
+                }
+            )[:-1] + b',"timestamp":'
+            for operational_status in OPERATIONAL_STATUSES
+        }
+
+    def render_metrics(self) -> bytes:
+        """Serialize the current metrics of the turbine.
+
+        Returns:
+            bytes: JSON object with the same schema as TurbineMetrics.
+        """
+        return self._metrics_templates[self.operational_status] + repr(time.time()).encode() + b"}"
 
     async def repair(self):
         """Repair the wind turbine."""
         try:
-            await self.collect_repairs()  # Pull from the repairs queue
             await asyncio.sleep(self.time_to_repair_in_seconds)
-            self.operational_status = OperationalStatus.ok
-            self.time_passed_in_seconds = 0.0
+            self.operational_status = OK
+            self.started_at_in_seconds = asyncio.get_running_loop().time()
         except Exception as e:
-            print(f"Could not repair turbine: {self.turbine_number}", e)
+            logger.exception("Could not repair turbine: %d", self.turbine_number)
             raise e
 
     async def receive_repairs(self):
         """Receive repairs for the wind turbine.
 
-        Note: Put a TurbineMetrics object in the repairs queue and wait for it to be repaired.
+        Note: The turbine is repaired in place; no other task picks up its repairs, so no queue handoff is needed.
         """
         try:
-            # Put a message in the queue to indicate that the turbine is broken
-            random_wind_speed = produce_random_wind_speed()
-            random_power_output_in_kwh = produce_random_power_output_in_kwh()
-
-            await repairs_queue.put(
-                TurbineMetrics(
-                    turbine_number=self.turbine_number, 
-                    wind_speed=random_wind_speed,
-                    power_output_in_kwh=random_power_output_in_kwh,
-                    operational_status=self.operational_status,
-                    timestamp=time.time()
-                )
-            )
-            # Call the repair function to pull the message from the queue and repair the turbine
             await self.repair()
         except Exception as e:
-            print(f"Could not receive repairs for turbine: {self.turbine_number}\n", e)
+            logger.exception("Could not receive repairs for turbine: %d", self.turbine_number)
             raise e
-    
-    async def collect_repairs(self) -> TurbineMetrics:
-        """Pull broken turbines from the repairs queue"""
-        return await repairs_queue.get()
 
     async def produce_metrics_indefinitely(self) -> None:
         """Produce metrics indefinitely.
@@ -141,28 +279,24 @@ class WindTurbine:
             While the grid monitor app is running, it should collect metrics every upload_frequency_in_seconds.
             If the turbine has been running for time_to_fail_in_seconds or more, its status should be changed to broken,
                 and it should start waiting for repairs, but still produce metrics.
+            Time since the start/repair is measured with the monotonic event loop clock, so delayed
+                wake-ups from asyncio.sleep do not accumulate drift.
         """
+        loop = asyncio.get_running_loop()
+        self.started_at_in_seconds = loop.time()
 
         while True:
         # for _ in range(30):  Run the grid monitor app for 30 seconds
-            await self.produce_metrics(
-                TurbineMetrics(
-                    turbine_number=self.turbine_number,
-                    wind_speed = self.wind_speed,
-                    power_output_in_kwh = self.power_output_in_kwh,
-                    operational_status=self.operational_status,
-                    timestamp=time.time()
-                )
-            )
+            await self.batcher.submit(self.render_metrics())
             await asyncio.sleep(self.upload_frequency_in_seconds)
-            self.time_passed_in_seconds += self.upload_frequency_in_seconds
-            
+
             # Change the status to broken if the turbine has been running for time_to_fail_in_seconds or more
-            if self.time_passed_in_seconds >= self.time_to_fail_in_seconds:
-                self.operational_status = OperationalStatus.broken
+            if loop.time() - self.started_at_in_seconds >= self.time_to_fail_in_seconds:
+                self.operational_status = BROKEN
                 # NOTE: Simulate new metrics when the turbine becomes broken then repaired
                 # self.wind_speed = produce_random_wind_speed()
                 # self.power_output_in_kwh = produce_random_power_output_in_kwh()
+                # self.build_metrics_templates()
 
     async def receive_repairs_indefinitely(self) -> None:
         """Receive repairs indefinitely.
@@ -173,7 +307,7 @@ class WindTurbine:
         while True:
         # OPTIONAL: Run the grid monitor app for 30 seconds
         # for _ in range(30):
-            if self.operational_status == OperationalStatus.broken:
+            if self.operational_status == BROKEN:
                 await self.receive_repairs()
             else:
                 await asyncio.sleep(self.upload_frequency_in_seconds)
@@ -182,41 +316,47 @@ class WindTurbine:
         """Run the wind turbine app.
 
         Note: Create a task for producing metrics indefinitely and a task for receiving repairs indefinitely.
+            If the turbine was not given a shared batcher, a task running its own batcher is created as well.
         """
-        producer_task = asyncio.create_task(self.produce_metrics_indefinitely())
-        listener_task = asyncio.create_task(self.receive_repairs_indefinitely())
-        done, pending = await asyncio.wait(
-            [producer_task, listener_task],
-            return_when=asyncio.FIRST_COMPLETED,
-        )
-        for task in pending:
-            task.cancel()
+        if self._owns_batcher:
+            self.batcher = MetricsBatcher(self.grid_monitor_url)
+        # If any task fails, the task group cancels the others and propagates the error.
+        async with asyncio.TaskGroup() as tg:
+            if self._owns_batcher:
+                tg.create_task(self.batcher.run(), context=_EMPTY_CONTEXT)
+            tg.create_task(self.produce_metrics_indefinitely(), context=_EMPTY_CONTEXT)
+            tg.create_task(self.receive_repairs_indefinitely(), context=_EMPTY_CONTEXT)
 
 @app.command()
 def run_wind_turbine(
     turbine_number: int = typer.Option(
         default=1,
-        help="Specify the unique identifier of the wind turbine",
+        help="Specify the unique identifier of the first wind turbine; the others are numbered consecutively",
     ),
-    random_wind_speed: float = typer.Option(
-        default=produce_random_wind_speed(),
-        help="Specify the wind speed in km/h",
+    count: int = typer.Option(
+        default=5,
+        min=1,
+        help="Specify the number of wind turbines to create",
     ),
-    random_power_output_in_kwh: float = typer.Option(
-        default=produce_random_power_output_in_kwh(),
-        help="Specify the power output in kWh",
+    random_wind_speed: Optional[float] = typer.Option(
+        default=None,
+        help="Specify the wind speed in km/h; random for each turbine if not set",
+    ),
+    random_power_output_in_kwh: Optional[float] = typer.Option(
+        default=None,
+        help="Specify the power output in kWh; random for each turbine if not set",
     ),
     upload_frequency_in_seconds: float = typer.Option(
         default=1.0,
         help="Specify the frequency with which the turbine produces metrics",
     ),
-    time_to_fail_in_seconds: float = typer.Option(
-        default=max(random.random() * 30.0, 1.0),
-        help="Specify the time after which the turbine should fail",
+    time_to_fail_in_seconds: Optional[float] = typer.Option(
+        default=None,
+        help="Specify the time after which the turbine should fail; random for each turbine if not set",
     ),
-    time_to_repair_in_seconds: float = typer.Option(
-        default=max(random.random() * 5.0, 1.0),
-        help="Specify the time it takes for the turbine to be repaired",
+    time_to_repair_in_seconds: Optional[float] = typer.Option(
+        default=None,
+        help="Specify the time it takes for the turbine to be repaired; random for each turbine if not set",
     ),
     grid_monitor_url: str = typer.Option(
         default="http://grid-monitor-app:8787",
@@ -225,23 +365,37 @@ def run_wind_turbine(
 ) -> None:
     """Create multiple wind turbines and run them asynchronously."""
     turbines = []
-
-    for turbine_number in range(1, 6):        
-        random_wind_speed = produce_random_wind_speed()
-        random_power_output_in_kwh = produce_random_power_output_in_kwh()
-        random_time_to_fail_in_seconds = produce_random_time_to_fail_in_seconds()
-        random_time_to_repair_in_seconds = produce_random_time_to_repair_in_seconds()
+    batcher = MetricsBatcher(grid_monitor_url)  # All turbines push their metrics through one batcher
+
+    # Draw the random parameters of every turbine at once; options set on the command line take precedence.
+    random_batches = produce_random_batches(count)
+    for i, random_batch in enumerate(random_batches):
+        (
+            drawn_wind_speed,
+            drawn_power_output_in_kwh,
+            drawn_time_to_fail_in_seconds,
+            drawn_time_to_repair_in_seconds,
+        ) = random_batch
 
         wind_turbine = WindTurbine(
-            turbine_number,
-            random_wind_speed,
-            random_power_output_in_kwh,
-            time_to_fail_in_seconds=random_time_to_fail_in_seconds,
-            time_to_repair_in_seconds=random_time_to_repair_in_seconds
+            turbine_number + i,
+            random_wind_speed if random_wind_speed is not None else drawn_wind_speed,
+            random_power_output_in_kwh if random_power_output_in_kwh is not None else drawn_power_output_in_kwh,
+            upload_frequency_in_seconds=upload_frequency_in_seconds,
+            time_to_fail_in_seconds=(
+                time_to_fail_in_seconds if time_to_fail_in_seconds is not None else drawn_time_to_fail_in_seconds
+            ),
+            time_to_repair_in_seconds=(
+                time_to_repair_in_seconds if time_to_repair_in_seconds is not None else drawn_time_to_repair_in_seconds
+            ),
+            grid_monitor_url=grid_monitor_url,
+            batcher=batcher,
         )
         turbines.append(wind_turbine)
 
-    asyncio.run(run_wind_turbines(turbines))
+    uvloop.install()  # Use uvloop for a faster event loop than the default asyncio one
+    with queued_logging():
+        asyncio.run(run_wind_turbines(turbines))
 
 async def run_wind_turbines(turbines: List[WindTurbine]) -> None:
     """Run wind turbines asynchronously
@@ -249,17 +403,33 @@ async def run_wind_turbines(turbines: List[WindTurbine]) -> None:
     Args:
         turbines (List[WindTurbine]): List of wind turbines to be run asynchronously.
     """
-    tasks = [turbine.run() for turbine in turbines]
+    # Each distinct shared batcher is run once, however many turbines share it; turbines without one run their own.
+    batchers = {id(turbine.batcher): turbine.batcher for turbine in turbines if turbine.batcher is not None}.values()
+    tasks = [batcher.run() for batcher in batchers] + [turbine.run() for turbine in turbines]
 
-    # Schedules the run() coroutine method to be executed concurrently, for each WindTurbine object, as a Task.
+    # Schedules the run() coroutine method to be executed concurrently, for each MetricsBatcher and WindTurbine object, as a Task.
     await asyncio.gather(*tasks)
 
 
 class GridMonitor:
-    def __init__(self, engineer_count: int, metrics_queue: asyncio.Queue = None):
-        self.engineer_count = engineer_count
+    def __init__(
+        self,
+        engineer_count: int,
+        metrics_queue: asyncio.Queue = None,
+        write_batch_size: int = 100,
+        max_queued_records: int = 10_000,
+    ):
+        self._engineers = asyncio.Semaphore(engineer_count)  # Available repair engineers, engineer_count at most
+        self.dispatch_tasks = set()  # Repairs in progress or waiting for an engineer
         self.last_turbines_metrics = {}
         self.metrics_queue = metrics_queue
+        self.dropped_metrics_count = 0  # Metrics dropped because the metrics or records queue was full
+        # Serialized metrics waiting to be appended to the metrics log, at most write_batch_size per write
+        self.write_batch_size = write_batch_size
+        self._metrics_records_queue = asyncio.Queue(maxsize=max_queued_records)
+        self._metrics_log_fd: int | None = None
+        # Directory of the metrics log in the Docker shared volume; created once, when the log is opened
+        self.metrics_data_dir = Path(__file__).resolve().parent.parent / "data/metrics_data"
 
     async def dispatch_engineer(self, turbine_number: int, wind_speed: float, power_output_in_kwh: float) -> None:        
         """Dispatch an engineer to fix a broken wind turbine, if a repair engineer is available.
@@ -270,21 +440,55 @@ class GridMonitor:
             power_output_in_kwh (float): Power output in kWh.
         """
         # If there are no engineers available, log a message saying so. And wait for an engineer to become available.
-        if self.engineer_count == 0:
-            print("No engineers available. Waiting for one to become available.")
-            # return
-        # If there are engineers available, dispatch one to fix the turbine.
-        else:
-            self.engineer_count -= 1  # Decrement the number of available repair engineers
-            print(f"Dispatching an engineer to fix turbine: {turbine_number}")
+        if self._engineers.locked():
+            logger.warning("No engineers available. Waiting for one to become available.")
+        # Acquire an engineer to fix the turbine; the engineer is released once the repair is done or has failed.
+        async with self._engineers:
+            logger.info("Dispatching an engineer to fix turbine: %d", turbine_number)
             try:
                 await WindTurbine(turbine_number, wind_speed, power_output_in_kwh).receive_repairs()
             except Exception as e:
-                self.engineer_count += 1  # Increment the number of available repair engineers
-                print(f"Could not dispatch an engineer to fix turbine: {turbine_number}\n", e)
+                logger.exception("Could not dispatch an engineer to fix turbine: %d", turbine_number)
                 raise e
 
-            self.engineer_count += 1  # Increment the number of available repair engineers
+    def start_dispatch(self, turbine_number: int, wind_speed: float, power_output_in_kwh: float) -> None:
+        """Dispatch an engineer in a separate task, so that metrics keep being collected during the repair.
+
+        Args:
+            turbine_number (int): Unique identifier of the turbine.
+            wind_speed (float): Wind speed in km/h.
+            power_output_in_kwh (float): Power output in kWh.
+        """
+        task = asyncio.create_task(
+            self.dispatch_engineer(turbine_number, wind_speed, power_output_in_kwh), context=_EMPTY_CONTEXT
+        )
+        self.dispatch_tasks.add(task)  # Keep a reference to the task until it is done
+        task.add_done_callback(self._on_dispatch_done)
+
+    def _on_dispatch_done(self, task: asyncio.Task) -> None:
+        """Forget a finished dispatch; its failure has already been logged by dispatch_engineer."""
+        self.dispatch_tasks.discard(task)
+        if not task.cancelled():
+            task.exception()  # Mark the exception as retrieved
+
+    def receive_metrics(self, turbine_metrics: TurbineMetrics) -> None:
+        """Put turbine metrics in the metrics queue without waiting.
+
+        Note: If the metrics queue is full, the metrics are dropped and counted in dropped_metrics_count,
+            so a grid monitor that falls behind sheds load instead of growing the queue without bound.
+        Args:
+            turbine_metrics (TurbineMetrics): Turbine metrics to be collected.
+        """
+        try:
+            self.metrics_queue.put_nowait(turbine_metrics)
+        except asyncio.QueueFull:
+            self.count_dropped_metrics()
+
+    def count_dropped_metrics(self) -> None:
+        """Count dropped metrics, warning on the first drop and every DROPPED_METRICS_WARNING_INTERVAL drops after it."""
+        self.dropped_metrics_count += 1
+        if self.dropped_metrics_count % DROPPED_METRICS_WARNING_INTERVAL == 1:
+            logger.warning("The grid monitor is falling behind; %d metrics dropped so far.", self.dropped_metrics_count)
 
     async def collect_metrics(self) -> TurbineMetrics:
         """Collect metrics from the metrics queue.
@@ -295,24 +499,71 @@ class GridMonitor:
         # Remove and return an item from the queue. If queue is empty, wait until an item is available.
         return await self.metrics_queue.get()
 
+    def open_metrics_log(self) -> None:
+        """Open the metrics log shared by all turbines in append mode."""
+        self.metrics_data_dir.mkdir(parents=True, exist_ok=True)
+        self._metrics_log_fd = os.open(self.metrics_data_dir / METRICS_LOG_FILE_NAME, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def _append_records(self, records: List[bytes]) -> None:
+        """Append serialized metrics to the metrics log with a single write.
+
+        Args:
+            records (List[bytes]): Serialized metrics, one JSON line each.
+        """
+        os.write(self._metrics_log_fd, b"".join(records))
+
+    def close_metrics_log(self) -> None:
+        """Append the metrics still waiting in the records queue and close the metrics log."""
+        if self._metrics_log_fd is None:
+            return
+        records = []
+        while not self._metrics_records_queue.empty():
+            records.append(self._metrics_records_queue.get_nowait())
+        if records:
+            self._append_records(records)
+        os.close(self._metrics_log_fd)
+        self._metrics_log_fd = None
+
     async def store_metrics(self, turbine_metrics: TurbineMetrics) -> None:
         """Store turbine metrics in a Docker shared volume.
 
+        Note: The metrics are serialized as a JSON line and queued for write_metrics_indefinitely,
+            which appends them to the metrics log shared by all turbines. If the writer falls behind
+            and the records queue is full, the metrics are dropped and counted in dropped_metrics_count.
         Args:
             turbine_metrics (TurbineMetrics): Turbine metrics to be stored.
         """
         # Alternative: Store metrics in a database (e.g. S3, MongoDB, PostgreSQL, DynamoDB, etc.)
-        project_dir = Path(__file__).parent.parent.absolute()
-        data_dir = project_dir / "data/metrics_data"
-        Path.mkdir(data_dir, parents=True, exist_ok=True)
         try:
-            async with aiofiles.open(data_dir / f"turbine_{turbine_metrics.turbine_number}.txt", mode="a") as f:  # Context manager
-                await f.write(turbine_metrics.model_dump_json())
-                await f.write("\n")
+            self._metrics_records_queue.put_nowait(turbine_metrics.model_dump_json().encode() + b"\n")
+        except asyncio.QueueFull:
+            self.count_dropped_metrics()
         except Exception as e:
-            print(f"Could not store metrics for turbine: {turbine_metrics.turbine_number}\n", e)
+            logger.exception("Could not store metrics for turbine: %d", turbine_metrics.turbine_number)
             raise e
 
+    async def write_metrics_indefinitely(self) -> None:
+        """Append the stored metrics to the metrics log indefinitely.
+
+        Note: Every metrics record queued since the last write, up to write_batch_size, is appended with a single write.
+        """
+        if self._metrics_log_fd is None:
+            try:
+                self.open_metrics_log()
+            except Exception as e:
+                logger.exception("Could not open the metrics log in: %s", self.metrics_data_dir)
+                raise e
+        while True:
+            # Wait for the next record, then take whatever else has been queued in the meantime.
+            records = [await self._metrics_records_queue.get()]
+            while len(records) < self.write_batch_size and not self._metrics_records_queue.empty():
+                records.append(self._metrics_records_queue.get_nowait())
+            try:
+                self._append_records(records)
+            except Exception as e:
+                logger.exception("Could not write %d metrics to the metrics log.", len(records))
+                raise e
+
     async def run(self) -> None:
         """Run the grid monitor app."""
         while True:
@@ -330,28 +581,42 @@ class GridMonitor:
                 # Optionally, improve the below logic to capture potential corner cases
                 # If the turbine is broken, and it has not yet emitted any metrics, dispatch an engineer
                 if (
-                    turbine_metrics.operational_status == OperationalStatus.broken
+                    turbine_metrics.operational_status == BROKEN
                     and last_turbine_metrics is None
                 ) or (
                     # If the turbine is broken, and it has emitted metrics previously, 
                     # and the last emitted metrics were ok, dispatch an engineer
-                    turbine_metrics.operational_status == OperationalStatus.broken
-                    and last_turbine_metrics.operational_status == OperationalStatus.ok
+                    turbine_metrics.operational_status == BROKEN
+                    and last_turbine_metrics.operational_status == OK
                 ):
                     # Generate new/different metrics when the turbine becomes broken
-                    await self.dispatch_engineer(
+                    self.start_dispatch(
                         turbine_metrics.turbine_number,
                         produce_random_wind_speed(),
                         produce_random_power_output_in_kwh(),
                     )
             except Exception as e:
-                print("Could not run the grid monitor app.\n", e)
+                logger.exception("Could not run the grid monitor app.")
                 raise e
 
 
 grid_monitor_task = None
-grid_monitor_metrics_queue = asyncio.Queue()  # Create a queue of work; non-blocking async queue.
-grid_monitor = GridMonitor(5, metrics_queue=grid_monitor_metrics_queue)  # Create a grid monitor instance with 3 engineers.
+grid_monitor_writer_task = None
+
+
+def on_grid_monitor_writer_done(task: asyncio.Task) -> None:
+    """Stop the grid monitor if the metrics writer has failed, since the collected metrics could no longer be stored.
+
+    Args:
+        task (asyncio.Task): The metrics writer task.
+    """
+    if task.cancelled() or task.exception() is None:
+        return
+    logger.error("The metrics writer has stopped; stopping the grid monitor.", exc_info=task.exception())
+    if grid_monitor_task is not None and not grid_monitor_task.done():
+        grid_monitor_task.cancel()
+grid_monitor_metrics_queue = asyncio.Queue(maxsize=10_000)  # Create a bounded queue of work; non-blocking async queue.
+grid_monitor = GridMonitor(5, metrics_queue=grid_monitor_metrics_queue)  # Create a grid monitor instance with 5 engineers.
 
 
 @asynccontextmanager
@@ -364,11 +629,18 @@ async def grid_monitor_lifespan(app: FastAPI):
     Args:
         app (FastAPI): FastAPI instance.
     """
-    global grid_monitor_task
-    grid_monitor_task = asyncio.create_task(grid_monitor.run())
-    yield
-    if not grid_monitor_task.done():
-        grid_monitor_task.cancel()
+    global grid_monitor_task, grid_monitor_writer_task
+    with queued_logging():
+        grid_monitor_task = asyncio.create_task(grid_monitor.run(), context=_EMPTY_CONTEXT)
+        grid_monitor_writer_task = asyncio.create_task(grid_monitor.write_metrics_indefinitely(), context=_EMPTY_CONTEXT)
+        grid_monitor_writer_task.add_done_callback(on_grid_monitor_writer_done)
+        yield
+        tasks = (grid_monitor_task, grid_monitor_writer_task, *grid_monitor.dispatch_tasks)
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        grid_monitor.close_metrics_log()
 
 # Pass in the async context manager directly into FastAPI
 grid_monitor_app = FastAPI(lifespan=grid_monitor_lifespan)
@@ -381,8 +653,19 @@ async def on_post_metrics(turbine_metrics: TurbineMetrics) -> None:
     Args:
         turbine_metrics (TurbineMetrics): Turbine metrics to be pushed to the grid monitor app.
     """
-    # Put an item into the queue. If the queue is full, wait until a free slot is available before adding item.
-    await grid_monitor_metrics_queue.put(turbine_metrics)
+    # Put an item into the queue. If the queue is full, the item is dropped instead of waiting for a free slot.
+    grid_monitor.receive_metrics(turbine_metrics)
+
+
+@grid_monitor_app.post("/post_metrics_batch")
+async def on_post_metrics_batch(turbine_metrics_batch: List[TurbineMetrics]) -> None:
+    """POST request endpoint for pushing a batch of turbine metrics in a single request.
+
+    Args:
+        turbine_metrics_batch (List[TurbineMetrics]): Turbine metrics to be pushed to the grid monitor app.
+    """
+    for turbine_metrics in turbine_metrics_batch:
+        grid_monitor.receive_metrics(turbine_metrics)
 
 
 @app.command()
@@ -397,7 +680,7 @@ def run_grid_monitor(
     ),
 ) -> None:
     """Run the grid monitor app. This is the main entry point for the program."""
-    uvicorn.run(grid_monitor_app, host=host, port=port, log_level="info")
+    uvicorn.run(grid_monitor_app, host=host, port=port, log_level="info", loop="uvloop")
 
 
 if __name__ == "__main__":
@@ -1,14 +1,20 @@
 import streamlit as st
 import subprocess
 from pathlib import Path
-from zipfile import ZipFile
+from zipfile import ZIP_DEFLATED, ZipFile
+import io
 import os
 
 from markdown_text import APP_USAGE, APP_FUNCTIONALITY
+from metrics_log import group_metrics_by_turbine
 
 
 PROJECT_DIR = Path(__file__).parent.parent.parent.absolute()
 METRICS_DATA_PATH = PROJECT_DIR / "data/metrics_data"
+METRICS_LOG_PATH = METRICS_DATA_PATH / "turbine_metrics.txt"  # Append-only log shared by all turbines
+# Byte budget for the tail of the shared metrics log that is displayed, whatever the number of turbines;
+# the more turbines there are, the fewer recent metrics are shown for each of them
+METRICS_TAIL_SIZE_IN_BYTES = 320 * 1024
 
 
 def run_wind_turbines():
@@ -17,22 +23,41 @@ def run_wind_turbines():
     subprocess.run(["python3", str(path_to_main), "run-wind-turbine"], capture_output=True)
 
 
+@st.cache_data(ttl=5)
+def read_metrics_tail(metrics_file_path: Path, modified_time: float) -> dict:
+    """Reads the last METRICS_TAIL_SIZE_IN_BYTES of the metrics log, grouped by turbine number; 
+    the modified time is part of the cache key so the cache is refreshed when the file changes
+    """
+    with open(metrics_file_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - METRICS_TAIL_SIZE_IN_BYTES))
+        tail = f.read()
+    if size > METRICS_TAIL_SIZE_IN_BYTES:
+        tail = tail.split(b"\n", 1)[-1]  # Drop the partially read first line
+    return group_metrics_by_turbine(tail.decode(errors="ignore"))
+
+
 def get_metrics_from_turbines():
-    """Retrieves the metrics for each turbine from the metrics_data 
-    folder and places them inside streamlit the text field
+    """Retrieves the most recent metrics for each turbine from the metrics log in the 
+    metrics_data folder and places them inside streamlit the text field
     """
 
-    for t in range(1, 6):
-        with open(METRICS_DATA_PATH / f"turbine_{t}.txt", "r") as f:
-            st.text(f"Metrics for turbine {t}:\n {f.read()}")
-            st.text("--------------------------------------------------")
+    metrics_by_turbine = read_metrics_tail(METRICS_LOG_PATH, os.path.getmtime(METRICS_LOG_PATH))
+    for t, metrics in metrics_by_turbine.items():
+        st.text(f"Metrics for turbine {t}:\n {metrics}")
+        st.text("--------------------------------------------------")
 
 
-def generate_zip_file_for_metrics():
-    """Zips the turbine metrics files from the wind turbines"""
-    with ZipFile(METRICS_DATA_PATH / 'metrics.zip', 'w') as myzip:
-        for t in range(1,6):
-            myzip.write(f'{METRICS_DATA_PATH}/turbine_{t}.txt', f'turbine_{t}.txt')
+def generate_zip_file_for_metrics() -> bytes:
+    """Zips the metrics of the wind turbines in memory, one file per turbine, and returns the zip file contents"""
+    with open(METRICS_LOG_PATH, "r") as f:
+        metrics_by_turbine = group_metrics_by_turbine(f.read())
+    buffer = io.BytesIO()
+    with ZipFile(buffer, 'w', compression=ZIP_DEFLATED) as myzip:
+        for t, metrics in metrics_by_turbine.items():
+            myzip.writestr(f'turbine_{t}.txt', metrics + "\n")
+    return buffer.getvalue()
 
 
 def create_GUI():
@@ -55,8 +80,7 @@ def create_GUI():
     if st.button(
         "Display Metrics", 
         help="Displays the metrics from the wind turbines in the browser\n this can be pressed many times to update the metrics displayed"):
-        metrics_data_contents = os.listdir(METRICS_DATA_PATH)
-        if len(metrics_data_contents) != 0:
+        if METRICS_LOG_PATH.exists():
             try:
                 get_metrics_from_turbines()  # Metrics are only displayed once per click (e.g. on-demand)
             except Exception as e:
@@ -69,17 +93,19 @@ def create_GUI():
         "Zip Turbine Metrics", 
         help="Zips the turbine metrics files from the wind turbines and provides user with a download button for direct download"): # \
         
-        metrics_data_contents = os.listdir(METRICS_DATA_PATH)
-        
-        if len(metrics_data_contents) != 0:
-            generate_zip_file_for_metrics()
-            st.success("Metrics persisted as zip file successfully!")
+        if METRICS_LOG_PATH.exists():
+            try:
+                metrics_zip = generate_zip_file_for_metrics()
+            except Exception as e:
+                st.error("There was an error zipping the metrics. Please try again. Here was the error:\n")
+                st.error(e)
+            else:
+                st.success("Metrics zipped successfully!")
 
-            st.text("Download the metrics zip file to your local machine, here:\n")
-            with open(METRICS_DATA_PATH / "metrics.zip", "rb") as f:
+                st.text("Download the metrics zip file to your local machine, here:\n")
                 st.download_button(
                     label="Download Wind Turbine Metrics",
-                    data=f,
+                    data=metrics_zip,
                     file_name="metrics.zip",
                     mime="application/zip",
                     key="metrics_download",
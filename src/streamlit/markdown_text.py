@@ -12,7 +12,7 @@ APP_USAGE = """
             "turbine_number": int,
             "wind_speed": float,
             "power_output_in_kwh": float,
-            "operational_status": OperationalStatus
+            "operational_status": "ok" | "broken"
             "timestamp": float
         }        
         
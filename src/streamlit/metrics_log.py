@@ -0,0 +1,17 @@
+from collections import defaultdict
+import json
+
+
+def group_metrics_by_turbine(metrics: str) -> dict:
+    """Groups the JSON lines of the metrics log by turbine number, keeping the order in which they were written;
+    a trailing line without a newline is still being written and lines that cannot be parsed are skipped
+    """
+    metrics_by_turbine = defaultdict(list)
+    lines = metrics.split("\n")[:-1]  # Drop the trailing incomplete line, empty if the log ends with a newline
+    for line in lines:
+        try:
+            turbine_number = json.loads(line)["turbine_number"]
+        except (ValueError, KeyError, TypeError):
+            continue
+        metrics_by_turbine[turbine_number].append(line)
+    return {t: "\n".join(turbine_lines) for t, turbine_lines in sorted(metrics_by_turbine.items())}
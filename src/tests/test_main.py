@@ -1,9 +1,15 @@
 import pytest
+import httpx
+from typer.testing import CliRunner
 from httpx import AsyncClient
 import time
+import asyncio
+import json
 
+import main
 from main import grid_monitor_app as app
-from main import OperationalStatus, TurbineMetrics, WindTurbine
+from main import grid_monitor_metrics_queue
+from main import BROKEN, OK, OPERATIONAL_STATUSES, GridMonitor, MetricsBatcher, TurbineMetrics, WindTurbine
 import logging
 
 
@@ -18,7 +24,7 @@ turbine_metrics_wind_speed = TurbineMetrics(
     turbine_number=wt_turbine_metrics_wind_speed.turbine_number,
     wind_speed=wt_turbine_metrics_wind_speed.wind_speed,
     power_output_in_kwh=wt_turbine_metrics_wind_speed.power_output_in_kwh,
-    operational_status=OperationalStatus.ok,
+    operational_status=OK,
     timestamp=time.time()
 )
 
@@ -33,7 +39,7 @@ turbine_metrics_power_output_in_kwh = TurbineMetrics(
     turbine_number=wt_turbine_metrics_power_output_in_kwh.turbine_number,
     wind_speed=wt_turbine_metrics_power_output_in_kwh.wind_speed,
     power_output_in_kwh=wt_turbine_metrics_power_output_in_kwh.power_output_in_kwh,
-    operational_status=OperationalStatus.broken,
+    operational_status=BROKEN,
     timestamp=time.time()
 )
 
@@ -50,4 +56,270 @@ async def test_post_request(metrics_model_dump, base_url):
         response = await ac.post("/post_metrics", json=metrics_model_dump, timeout=30)
         response.raise_for_status()  # Raise HTTPStatusError if one occurred.
 
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+@pytest.mark.anyio
+async def test_post_batch_request():
+    """Asynchronously test a batched POST request to the grid monitor app"""
+    metrics_batch = [metrics_model_dump for metrics_model_dump, _ in test_post_request_inputs]
+    queue_size = grid_monitor_metrics_queue.qsize()
+    async with AsyncClient(app=app, base_url=wt_turbine_metrics_wind_speed.grid_monitor_url, timeout=30) as ac:
+        response = await ac.post("/post_metrics_batch", json=metrics_batch, timeout=30)
+        response.raise_for_status()  # Raise HTTPStatusError if one occurred.
+
+    assert response.status_code == 200
+    # Every metrics item of the batch is put on the grid monitor metrics queue, after the ones already queued
+    queued_metrics = [grid_monitor_metrics_queue.get_nowait() for _ in range(grid_monitor_metrics_queue.qsize())]
+    assert [turbine_metrics.model_dump() for turbine_metrics in queued_metrics[queue_size:]] == metrics_batch
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_metrics_batcher_flushes_full_and_partial_batches():
+    """Test that the metrics batcher sends a full batch right away and a partial batch after the flush interval"""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200)
+
+    batcher = MetricsBatcher(
+        wt_turbine_metrics_wind_speed.grid_monitor_url,
+        batch_size=3,
+        flush_interval_in_seconds=0.2,
+        transport=httpx.MockTransport(handler),
+    )
+    metrics = [WindTurbine(turbine_number, 1.0, 2.0).render_metrics() for turbine_number in range(1, 5)]
+    batcher_task = asyncio.create_task(batcher.run())
+    try:
+        for turbine_metrics in metrics:
+            await batcher.submit(turbine_metrics)
+
+        # The first three metrics fill a batch and are sent without waiting for the flush interval
+        await asyncio.sleep(0.05)
+        assert len(requests) == 1
+        assert requests[0].url.path == "/post_metrics_batch"
+        assert requests[0].headers["content-type"] == "application/json"
+        assert json.loads(requests[0].content) == [json.loads(m) for m in metrics[:3]]
+
+        # The remaining metrics are sent once the flush interval has elapsed
+        await asyncio.sleep(0.3)
+        assert len(requests) == 2
+        assert json.loads(requests[1].content) == [json.loads(m) for m in metrics[3:]]
+    finally:
+        batcher_task.cancel()
+        await asyncio.gather(batcher_task, return_exceptions=True)
+
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_metrics_batcher_survives_failed_requests_and_flushes_on_shutdown():
+    """Test that a failed batch is dropped without stopping the batcher, and queued metrics are sent on shutdown"""
+    responses = [httpx.Response(503), httpx.Response(200), httpx.Response(200)]
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return responses[len(requests) - 1]
+
+    batcher = MetricsBatcher(
+        wt_turbine_metrics_wind_speed.grid_monitor_url,
+        batch_size=2,
+        flush_interval_in_seconds=10.0,
+        transport=httpx.MockTransport(handler),
+    )
+    metrics = [WindTurbine(turbine_number, 1.0, 2.0).render_metrics() for turbine_number in range(1, 6)]
+    batcher_task = asyncio.create_task(batcher.run())
+    for turbine_metrics in metrics:
+        await batcher.submit(turbine_metrics)
+    await asyncio.sleep(0.05)
+
+    # The first batch failed, but the batcher kept sending batches
+    assert not batcher_task.done()
+    assert len(requests) == 2
+
+    # The last metrics, waiting for the flush interval, are sent when the batcher is cancelled
+    batcher_task.cancel()
+    await asyncio.gather(batcher_task, return_exceptions=True)
+    assert len(requests) == 3
+    assert json.loads(requests[2].content) == [json.loads(metrics[4])]
+
+
+@pytest.mark.parametrize("operational_status", OPERATIONAL_STATUSES)
+def test_render_metrics(operational_status):
+    """Test that the pre-serialized turbine metrics match the TurbineMetrics schema"""
+    wt_turbine = WindTurbine(turbine_number=1, wind_speed=74.13200003176283, power_output_in_kwh=2229.3846024355926)
+    wt_turbine.operational_status = operational_status
+    metrics_json = wt_turbine.render_metrics()
+
+    assert TurbineMetrics.model_validate_json(metrics_json).model_dump_json().encode() == metrics_json
+
+
+def test_receive_metrics_drops_when_queue_is_full(monkeypatch, caplog):
+    """Test that the grid monitor drops metrics instead of waiting when the metrics queue is full, and warns about it"""
+    monkeypatch.setattr(main, "DROPPED_METRICS_WARNING_INTERVAL", 2)
+    grid_monitor = GridMonitor(1, metrics_queue=asyncio.Queue(maxsize=1))
+    grid_monitor.receive_metrics(turbine_metrics_wind_speed)
+    with caplog.at_level(logging.WARNING, logger=main.logger.name):
+        for _ in range(3):
+            grid_monitor.receive_metrics(turbine_metrics_power_output_in_kwh)
+
+    assert grid_monitor.metrics_queue.qsize() == 1
+    assert grid_monitor.dropped_metrics_count == 3
+    # Warned on the first drop and on the third one only
+    assert [record.getMessage() for record in caplog.records] == [
+        "The grid monitor is falling behind; 1 metrics dropped so far.",
+        "The grid monitor is falling behind; 3 metrics dropped so far.",
+    ]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_dispatches_are_limited_by_engineer_count(monkeypatch):
+    """Test that broken turbines are repaired concurrently, by at most engineer_count engineers"""
+    repairs_in_progress = []
+    max_repairs_in_progress = 0
+
+    async def receive_repairs(self):
+        nonlocal max_repairs_in_progress
+        repairs_in_progress.append(self.turbine_number)
+        max_repairs_in_progress = max(max_repairs_in_progress, len(repairs_in_progress))
+        await asyncio.sleep(0.1)
+        repairs_in_progress.remove(self.turbine_number)
+
+    monkeypatch.setattr(WindTurbine, "receive_repairs", receive_repairs)
+    grid_monitor = GridMonitor(2, metrics_queue=asyncio.Queue())
+    monkeypatch.setattr(grid_monitor, "store_metrics", lambda turbine_metrics: asyncio.sleep(0))
+    for turbine_number in range(1, 4):
+        grid_monitor.receive_metrics(
+            TurbineMetrics(
+                turbine_number=turbine_number,
+                wind_speed=1.0,
+                power_output_in_kwh=1.0,
+                operational_status=BROKEN,
+                timestamp=time.time(),
+            )
+        )
+    run_task = asyncio.create_task(grid_monitor.run())
+    try:
+        # Metrics collection is not blocked by the repairs, which all get dispatched
+        await asyncio.sleep(0.05)
+        assert grid_monitor.metrics_queue.empty()
+        assert len(grid_monitor.dispatch_tasks) == 3
+        assert len(repairs_in_progress) == 2
+
+        await asyncio.sleep(0.2)
+        assert not grid_monitor.dispatch_tasks
+        assert max_repairs_in_progress == 2
+    finally:
+        run_task.cancel()
+        await asyncio.gather(run_task, return_exceptions=True)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_metrics_are_appended_to_the_metrics_log(monkeypatch, tmp_path):
+    """Test that queued metrics are appended with a single write and drained when the metrics log is closed"""
+    grid_monitor = GridMonitor(1, metrics_queue=asyncio.Queue())
+    grid_monitor.metrics_data_dir = tmp_path
+    metrics_log_writes = []
+    append_records = grid_monitor._append_records
+
+    def append_records_spy(records):
+        metrics_log_writes.append(records)
+        append_records(records)
+
+    monkeypatch.setattr(grid_monitor, "_append_records", append_records_spy)
+    metrics = [
+        TurbineMetrics.model_validate_json(WindTurbine(turbine_number, 1.0, 2.0).render_metrics())
+        for turbine_number in range(1, 6)
+    ]
+    for turbine_metrics in metrics[:3]:
+        await grid_monitor.store_metrics(turbine_metrics)
+
+    writer_task = asyncio.create_task(grid_monitor.write_metrics_indefinitely())
+    await asyncio.sleep(0.05)
+    writer_task.cancel()
+    await asyncio.gather(writer_task, return_exceptions=True)
+    assert len(metrics_log_writes) == 1
+
+    # Metrics still queued when the writer stops are written on close
+    for turbine_metrics in metrics[3:]:
+        await grid_monitor.store_metrics(turbine_metrics)
+    grid_monitor.close_metrics_log()
+    assert len(metrics_log_writes) == 2
+
+    metrics_log = (tmp_path / main.METRICS_LOG_FILE_NAME).read_text()
+    assert metrics_log == "".join(turbine_metrics.model_dump_json() + "\n" for turbine_metrics in metrics)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_metrics_writer_failure_stops_the_grid_monitor(monkeypatch, tmp_path, caplog):
+    """Test that a failing metrics writer is logged, stops the grid monitor, and stored metrics are bounded"""
+    metrics_data_file = tmp_path / "metrics_data"
+    metrics_data_file.write_text("")  # A regular file where the metrics directory should be
+    grid_monitor = GridMonitor(1, metrics_queue=asyncio.Queue(), max_queued_records=2)
+    grid_monitor.metrics_data_dir = metrics_data_file
+    turbine_metrics = TurbineMetrics.model_validate_json(WindTurbine(1, 1.0, 2.0).render_metrics())
+
+    with caplog.at_level(logging.ERROR, logger=main.logger.name):
+        with pytest.raises(FileExistsError):
+            await grid_monitor.write_metrics_indefinitely()
+    assert "Could not open the metrics log" in caplog.text
+
+    # Nothing drains the records queue anymore, so metrics beyond its size are dropped
+    for _ in range(3):
+        await grid_monitor.store_metrics(turbine_metrics)
+    assert grid_monitor._metrics_records_queue.qsize() == 2
+    assert grid_monitor.dropped_metrics_count == 1
+
+    # The lifespan stops collecting metrics once the writer has failed
+    monkeypatch.setattr(main, "grid_monitor", grid_monitor)
+    async with main.grid_monitor_lifespan(main.grid_monitor_app):
+        await asyncio.gather(main.grid_monitor_writer_task, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert main.grid_monitor_task.cancelled()
+
+
+def test_run_wind_turbine_options_reach_the_turbines(monkeypatch):
+    """Test that the command line options are used for every turbine, and only unset options are random"""
+    turbines = []
+
+    async def run_wind_turbines(wind_turbines):
+        turbines.extend(wind_turbines)
+
+    monkeypatch.setattr(main, "run_wind_turbines", run_wind_turbines)
+    monkeypatch.setattr(main.uvloop, "install", lambda: None)
+    result = CliRunner().invoke(
+        main.app,
+        [
+            "run-wind-turbine",
+            "--turbine-number", "10",
+            "--count", "3",
+            "--random-wind-speed", "42.0",
+            "--upload-frequency-in-seconds", "0.5",
+            "--time-to-fail-in-seconds", "7.0",
+            "--grid-monitor-url", "http://localhost:8787",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert [turbine.turbine_number for turbine in turbines] == [10, 11, 12]
+    for turbine in turbines:
+        assert turbine.wind_speed == 42.0
+        assert turbine.upload_frequency_in_seconds == 0.5
+        assert turbine.time_to_fail_in_seconds == 7.0
+        assert turbine.grid_monitor_url == "http://localhost:8787"
+        assert 0.0 <= turbine.power_output_in_kwh <= 3000.0
+        assert 1.0 <= turbine.time_to_repair_in_seconds <= 5.0
+    # All turbines push their metrics through one shared batcher
+    assert len({id(turbine.batcher) for turbine in turbines}) == 1
+
+
+def test_run_wind_turbine_rejects_non_positive_count():
+    """Test that the number of wind turbines must be at least 1"""
+    result = CliRunner().invoke(main.app, ["run-wind-turbine", "--count", "-1"])
+
+    assert result.exit_code == 2
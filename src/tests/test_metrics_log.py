@@ -0,0 +1,26 @@
+import importlib.util
+import json
+from pathlib import Path
+
+
+# Loaded from its path, since the src/streamlit package name clashes with the streamlit library
+metrics_log_spec = importlib.util.spec_from_file_location(
+    "metrics_log", Path(__file__).resolve().parent.parent / "streamlit" / "metrics_log.py"
+)
+metrics_log = importlib.util.module_from_spec(metrics_log_spec)
+metrics_log_spec.loader.exec_module(metrics_log)
+
+
+def test_group_metrics_by_turbine_skips_garbage_and_truncated_lines():
+    """Test that the metrics are grouped by turbine in log order, skipping garbage lines and the trailing partial line"""
+    lines = [json.dumps({"turbine_number": t, "wind_speed": w}) for t, w in [(2, 1.0), (1, 2.0), (2, 3.0)]]
+    garbage_lines = ["not json", json.dumps({"wind_speed": 4.0}), json.dumps([1, 2])]
+    truncated_line = json.dumps({"turbine_number": 1, "wind_speed": 5.0})[:-5]
+    metrics = "\n".join(lines[:2] + garbage_lines + lines[2:]) + "\n" + truncated_line
+
+    assert metrics_log.group_metrics_by_turbine(metrics) == {
+        1: lines[1],
+        2: lines[0] + "\n" + lines[2],
+    }
+    assert metrics_log.group_metrics_by_turbine(metrics + "\n").keys() == {1, 2}
+    assert metrics_log.group_metrics_by_turbine("") == {}
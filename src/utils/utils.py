@@ -1,5 +1,9 @@
 import random
 
+import numpy as np
+
+_rng = np.random.default_rng()
+
 def produce_random_wind_speed():
     """Produces a random wind speed between 0 and 100
 
@@ -34,3 +38,13 @@ def produce_random_time_to_repair_in_seconds():
     """    
     return max(random.random() * 5.0, 1.0)
 
+def produce_random_batches(count):
+    """Produces a random wind speed, power output in kWh, time to fail in seconds
+    and time to repair in seconds for each of count turbines from a single vectorized random draw
+
+    Returns:
+        list: count tuples of floats in the ranges [0, 100], [0, 3000], [1, 30] and [1, 5]
+    """
+    r = _rng.random((count, 4)) * np.array([100.0, 3000.0, 30.0, 5.0])
+    r[:, 2:] = np.maximum(r[:, 2:], 1.0)
+    return [tuple(row) for row in r.tolist()]